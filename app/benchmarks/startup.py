@@ -0,0 +1,107 @@
+"""
+Замер холодного старта приложения.
+
+    python -m app.benchmarks.startup --runs 5 --top 20 --max-import-ms 500
+
+Для каждого запуска поднимается отдельный интерпретатор, который
+импортирует app.main, проходит lifespan-старт и ждет окончания
+фонового прогрева (задача warm-up), то есть момента, когда воркер
+готов к нагрузке. Выводится медиана и максимум времени импорта,
+старта и готовности, а с --top - самые дорогие модули по данным
+`python -X importtime`. Пороги --max-import-ms и --max-ready-ms
+сравниваются с медианой; при превышении команда завершается с кодом 1.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def startup():
+    async with app.router.lifespan_context(app):
+        serving = time.perf_counter()
+        warm_up = [job for job in app.state.jobs if job.get_name() == "warm-up"]
+        await asyncio.wait(warm_up, timeout=%(timeout)s)
+        return serving, time.perf_counter(), all(app.state.warm.values())
+
+serving, ready, warm = asyncio.run(startup())
+print(json.dumps({
+    "import": imported - started,
+    "startup": serving - imported,
+    "ready": ready - imported,
+    "warm": warm,
+}))
+"""
+
+
+def run_probe(timeout: float) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE % {"timeout": timeout}],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_profile(top: int) -> list[tuple[int, str]]:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0)
+    parser.add_argument("--ready-timeout", type=float, default=60.0)
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-ready-ms", type=float)
+    args = parser.parse_args()
+
+    results = [run_probe(args.ready_timeout) for _ in range(args.runs)]
+    medians = {}
+    for key in ("import", "startup", "ready"):
+        values = [result[key] * 1000 for result in results]
+        medians[key] = statistics.median(values)
+        print(
+            f"{key:>8}: median {medians[key]:.1f} ms, "
+            f"max {max(values):.1f} ms ({args.runs} runs)"
+        )
+    cold = sum(not result["warm"] for result in results)
+    if cold:
+        print(f"warning: warm-up did not fully succeed in {cold} of {args.runs} runs")
+    if args.top:
+        print(f"\nTop {args.top} modules by cumulative import time:")
+        for cumulative, name in import_profile(args.top):
+            print(f"{cumulative / 1000:>10.1f} ms  {name}")
+
+    failed = False
+    for key, limit in (("import", args.max_import_ms), ("ready", args.max_ready_ms)):
+        if limit is not None and medians[key] > limit:
+            print(f"FAIL: median {key} {medians[key]:.1f} ms > {limit:.1f} ms")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
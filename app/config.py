@@ -9,6 +9,35 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
+    resume_cache_size: int = 1024
+    resume_cache_ttl_seconds: int = 60
+    resume_cache_redis_url: str | None = None
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_warmup: int = 2
+    db_max_connections: int = 100
+    web_host: str = "0.0.0.0"
+    web_port: int = 8000
+    web_workers: int | None = None
+    web_loop: str = "auto"
+    web_http: str = "auto"
+    web_graceful_shutdown_seconds: int = 30
+    readiness_db_timeout_seconds: float = 1.0
+    readiness_max_pool_saturation: float = 0.9
+    improvements_keep_last: int | None = None
+    improvements_retention_months: int | None = None
+    improvements_partitions_ahead: int = 3
+    improvements_archive_dir: str | None = None
+    improvements_archive_interval_seconds: int = 3600
+    change_feed_queue_size: int = 100
+    change_feed_heartbeat_seconds: int = 15
+    tracing_exporter: str = "none"
+    tracing_sample_rate: float = 0.01
+    tracing_otlp_endpoint: str = "http://localhost:4318"
+    tracing_file_path: str = "traces.jsonl"
+    tracing_service_name: str = "resume-api"
+    query_budget_mode: str = "off"
+    query_repeat_threshold: int = 3
 
     model_config = SettingsConfigDict(env_file="../.env", env_file_encoding="utf-8")
 
@@ -1,19 +1,99 @@
+import asyncio
+import time
 from typing import AsyncGenerator
 
 from app.config import settings
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.querybudget import install_query_counter
+from app.tracing import install_sql_tracing
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
 
-engine = create_async_engine(settings.database_url, echo=False)
-async_session_maker = async_sessionmaker(
-    engine, expire_on_commit=False, class_=AsyncSession
-)
+_engine: AsyncEngine | None = None
+_session_maker: async_sessionmaker[AsyncSession] | None = None
 
 
 class Base(DeclarativeBase):
     pass
 
 
+def get_engine() -> AsyncEngine:
+    """Создает движок БД при первом обращении (а не при импорте модуля)."""
+
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            settings.database_url,
+            echo=False,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_pre_ping=True,
+        )
+        install_sql_tracing(_engine)
+        install_query_counter(_engine)
+    return _engine
+
+
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    """Возвращает фабрику сессий, привязанную к движку БД."""
+
+    global _session_maker
+    if _session_maker is None:
+        _session_maker = async_sessionmaker(
+            get_engine(), expire_on_commit=False, class_=AsyncSession
+        )
+    return _session_maker
+
+
+async def dispose_engine() -> None:
+    """Закрывает соединения пула, если движок был создан."""
+
+    global _engine, _session_maker
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _session_maker = None
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session_maker() as session:
+    async with get_session_maker()() as session:
         yield session
+
+
+async def _ping() -> None:
+    async with get_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def warm_up_pool(connections: int) -> None:
+    """Открывает заранее несколько соединений пула, чтобы первые запросы не ждали."""
+
+    await asyncio.gather(*(_ping() for _ in range(connections)))
+
+
+async def check_db(timeout: float) -> float:
+    """Выполняет SELECT 1 с ограничением по времени и возвращает задержку в секундах."""
+
+    started = time.perf_counter()
+    await asyncio.wait_for(_ping(), timeout=timeout)
+    return time.perf_counter() - started
+
+
+def get_pool_status() -> dict:
+    """Возвращает загрузку пула соединений текущего воркера."""
+
+    pool = get_engine().pool
+    capacity = settings.db_pool_size + settings.db_max_overflow
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 3) if capacity else 1.0,
+    }
@@ -0,0 +1,28 @@
+import asyncio
+from typing import Coroutine
+
+from fastapi import FastAPI
+from loguru import logger
+
+
+def start_job(app: FastAPI, coro: Coroutine, name: str) -> asyncio.Task:
+    """Запускает фоновую задачу воркера и учитывает ее в app.state.jobs."""
+
+    with logger.contextualize(log_id=name):
+        task = asyncio.create_task(coro, name=name)
+    app.state.jobs.add(task)
+    task.add_done_callback(app.state.jobs.discard)
+    return task
+
+
+async def drain_jobs(app: FastAPI, timeout: float) -> None:
+    """Дожидается завершения фоновых задач, оставшиеся по таймауту отменяет."""
+
+    jobs = set(app.state.jobs)
+    if not jobs:
+        return
+    _, pending = await asyncio.wait(jobs, timeout=timeout)
+    for task in pending:
+        logger.warning(f"Cancelling background job {task.get_name()}")
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
@@ -1,12 +1,95 @@
+import asyncio
+import signal
+from contextlib import asynccontextmanager
 from uuid import uuid4
 
-from app.routers import ai, resume, user
+from app.config import settings
+from app.db import dispose_engine, warm_up_pool
+from app.jobs import drain_jobs, start_job
+from app.querybudget import query_budget_middleware
+from app.routers import ai, events, health, resume, user
+from app.services.archive import improvements_retention_loop
+from app.services.auth import warm_up_bcrypt
+from app.services.events import change_feed
+from app.tracing import shutdown_exporter, start_trace
 from fastapi import FastAPI, Request
 from loguru import logger
 from starlette.responses import JSONResponse
 
-app = FastAPI(title="Resume API", version="1.0.0")
 
+async def warm_up(app: FastAPI) -> None:
+    """Прогревает пул соединений и bcrypt-бэкенд, отмечая готовность в app.state."""
+
+    try:
+        await warm_up_pool(settings.db_pool_warmup)
+        app.state.warm["db_pool"] = True
+    except Exception as ex:
+        logger.error(f"DB pool warm-up failed: {ex}")
+    await asyncio.to_thread(warm_up_bcrypt)
+    app.state.warm["bcrypt"] = True
+
+
+def close_streams_on_exit() -> dict:
+    """
+    Закрывает потоки событий сразу по SIGTERM/SIGINT. Uvicorn вызывает
+    lifespan-остановку только после завершения всех соединений, поэтому
+    без этого SSE и WebSocket держали бы воркер до таймаута остановки.
+    Возвращает замененные обработчики, чтобы восстановить их при остановке.
+    """
+
+    loop = asyncio.get_running_loop()
+    replaced = {}
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(change_feed.close)
+            previous(signum, frame)
+
+        try:
+            signal.signal(sig, handler)
+        except ValueError:
+            # Не главный поток - сигналы недоступны.
+            break
+        replaced[sig] = previous
+    return replaced
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Запускает прогрев в фоне, чтобы воркер сразу начал принимать запросы,
+    и корректно освобождает ресурсы при остановке.
+    """
+
+    app.state.warm = {"db_pool": False, "bcrypt": False}
+    app.state.jobs = set()
+    app.state.in_flight = 0
+    app.state.shutdown = asyncio.Event()
+    change_feed.open()
+    signal_handlers = close_streams_on_exit()
+    start_job(app, warm_up(app), "warm-up")
+    start_job(
+        app,
+        improvements_retention_loop(app.state.shutdown),
+        "improvements-retention",
+    )
+    start_job(app, change_feed.listen(app.state.shutdown), "change-feed")
+    yield
+    change_feed.close()
+    for sig, handler in signal_handlers.items():
+        signal.signal(sig, handler)
+    app.state.shutdown.set()
+    with logger.contextualize(log_id="lifespan"):
+        await drain_jobs(app, settings.web_graceful_shutdown_seconds)
+    await dispose_engine()
+    await asyncio.to_thread(shutdown_exporter)
+    await logger.complete()
+
+
+app = FastAPI(title="Resume API", version="1.0.0", lifespan=lifespan)
 
 logger.add(
     "info.log",
@@ -16,10 +99,25 @@ logger.add(
 )
 
 
+app.middleware("http")(query_budget_middleware)
+
+
 @app.middleware("http")
 async def log_middleware(request: Request, call_next):
-    log_id = str(uuid4())
-    with logger.contextualize(log_id=log_id):
+    if request.url.path in health.PROBE_PATHS:
+        return await call_next(request)
+    # Один и тот же идентификатор в info.log, трассе и заголовке X-Trace-Id.
+    log_id = uuid4().hex
+    with logger.contextualize(log_id=log_id), start_trace(
+        f"{request.method} {request.url.path}",
+        trace_id=log_id,
+        method=request.method,
+        path=request.url.path,
+    ) as root_span:
+        # Потоки событий живут долго и не должны выглядеть как зависшие запросы.
+        counted = request.url.path not in events.STREAM_PATHS
+        if counted:
+            request.app.state.in_flight += 1
         try:
             response = await call_next(request)
             if response.status_code in [401, 403, 404]:
@@ -29,9 +127,17 @@ async def log_middleware(request: Request, call_next):
         except Exception as ex:
             logger.error(f"Request to {request.url.path} failed: {ex}")
             response = JSONResponse(content={"success": False}, status_code=500)
+        finally:
+            if counted:
+                request.app.state.in_flight -= 1
+        if root_span is not None:
+            root_span.attributes["status_code"] = response.status_code
+            response.headers["X-Trace-Id"] = log_id
         return response
 
 
+app.include_router(health.router)
 app.include_router(user.router)
 app.include_router(resume.router)
 app.include_router(ai.router)
+app.include_router(events.router)
@@ -1,18 +1,29 @@
 from app.db import Base
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 
 class ResumeImprovement(Base):
     __tablename__ = "resume_improvements"
+    __table_args__ = (
+        Index("ix_resume_improvements_resume_id_created_at", "resume_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    resume_id = Column(
+        Integer, ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False
+    )
     improved_content = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
+    )
 
-    resume = relationship("Resume", back_populates="improvements")
+    resume = relationship("Resume", back_populates="improvements", lazy="raise_on_sql")
 
 
 class Resume(Base):
@@ -22,10 +33,15 @@ class Resume(Base):
     title = Column(String, nullable=False)
     content = Column(Text, nullable=False)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    owner = relationship("User", back_populates="resumes")
+    owner = relationship("User", back_populates="resumes", lazy="raise_on_sql")
     improvements = relationship(
-        "ResumeImprovement", back_populates="resume", cascade="all, delete-orphan"
+        "ResumeImprovement",
+        back_populates="resume",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql",
     )
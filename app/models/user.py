@@ -12,4 +12,4 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
 
-    resumes = relationship("Resume", back_populates="owner")
+    resumes = relationship("Resume", back_populates="owner", lazy="raise_on_sql")
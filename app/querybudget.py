@@ -0,0 +1,127 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+from app.config import settings
+from fastapi import Request
+from loguru import logger
+from starlette.requests import HTTPConnection
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    db_time: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> List[str]:
+        """Запросы, выполненные не менее threshold раз (признак N+1)."""
+
+        return [
+            statement
+            for statement, times in self.statements.items()
+            if times >= threshold
+        ]
+
+
+_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Считает SQL-запросы и время в БД внутри блока (и в порожденных задачах)."""
+
+    stats = QueryStats()
+    token = _stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _stats.reset(token)
+
+
+def query_budget(limit: int):
+    """
+    Зависимость, объявляющая бюджет SQL-запросов маршрута (HTTP или WebSocket):
+
+        @router.get("/", dependencies=[Depends(query_budget(2))])
+    """
+
+    async def declare_budget(connection: HTTPConnection) -> None:
+        connection.state.query_budget = limit
+
+    # Бюджет доступен и без запроса - по списку зависимостей маршрута (в тестах).
+    declare_budget.query_budget = limit
+    return declare_budget
+
+
+def budget_violations(
+    stats: QueryStats, budget: Optional[int], repeat_threshold: int
+) -> List[str]:
+    """Описания нарушений бюджета и повторяющихся запросов (признак N+1)."""
+
+    violations = []
+    if budget is not None and stats.count > budget:
+        violations.append(f"{stats.count} queries, budget is {budget}")
+    for statement in stats.repeated(repeat_threshold):
+        violations.append(
+            f"statement executed {stats.statements[statement]} times "
+            f"(possible N+1): {statement[:200]}"
+        )
+    return violations
+
+
+def install_query_counter(engine) -> None:
+    """Подключает подсчет запросов к движку через события SQLAlchemy."""
+
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        stats = _stats.get()
+        if stats is not None and context is not None:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _stats.get()
+        if stats is None:
+            return
+        stats.count += 1
+        stats.statements[statement] += 1
+        started = getattr(context, "_query_started", None)
+        if started is not None:
+            stats.db_time += time.perf_counter() - started
+
+
+async def query_budget_middleware(request: Request, call_next):
+    """
+    В режиме "warn" считает запросы к БД на каждый HTTP-запрос, пишет
+    в лог превышение бюджета маршрута и повторы, добавляет заголовки
+    X-Query-Count и X-DB-Time-Ms. Ответ при этом не меняется: регрессии
+    ловят тесты (tests/test_query_budget.py).
+    """
+
+    if settings.query_budget_mode != "warn":
+        return await call_next(request)
+    with count_queries() as stats:
+        response = await call_next(request)
+    response.headers["X-Query-Count"] = str(stats.count)
+    response.headers["X-DB-Time-Ms"] = f"{stats.db_time * 1000:.2f}"
+    violations = budget_violations(
+        stats,
+        getattr(request.state, "query_budget", None),
+        settings.query_repeat_threshold,
+    )
+    if violations:
+        logger.error(
+            f"Query budget exceeded for {request.method} {request.url.path}: "
+            f"{'; '.join(violations)}"
+        )
+    return response
@@ -1,6 +1,7 @@
 from typing import Annotated, List
 
 from app.db import get_db
+from app.querybudget import query_budget
 from app.schemas import ResumeImprovement, UserResponse
 from app.services.ai import AIService
 from app.services.auth import AuthService
@@ -10,7 +11,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 router = APIRouter(prefix="/ai", tags=["ai"])
 
 
-@router.post("/resume/{resume_id}/improve", response_model=ResumeImprovement)
+@router.post(
+    "/resume/{resume_id}/improve",
+    response_model=ResumeImprovement,
+    dependencies=[Depends(query_budget(5))],
+)
 async def improve_resume(
     resume_id: int,
     db: Annotated[AsyncSession, Depends(get_db)],
@@ -25,7 +30,11 @@ async def improve_resume(
     return result["improvement"]
 
 
-@router.get("/resume/{resume_id}/improvements", response_model=List[ResumeImprovement])
+@router.get(
+    "/resume/{resume_id}/improvements",
+    response_model=List[ResumeImprovement],
+    dependencies=[Depends(query_budget(3))],
+)
 async def get_improvements(
     resume_id: int,
     db: Annotated[AsyncSession, Depends(get_db)],
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+from app.config import settings
+from app.db import get_session_maker
+from app.querybudget import query_budget
+from app.schemas import UserResponse
+from app.services.auth import AuthService
+from app.services.events import SHUTDOWN_EVENT, change_feed
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from starlette import status
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# Долгоживущие потоки не учитываются в числе запросов в работе.
+STREAM_PATHS = frozenset({"/events/resumes", "/events/resumes/ws"})
+
+
+@router.get("/resumes", dependencies=[Depends(query_budget(1))])
+async def stream_resume_events(
+    current_user: UserResponse = Depends(AuthService.get_current_user),
+):
+    """
+    Поток событий об изменении резюме текущего пользователя (Server-Sent
+    Events) вместо периодического опроса GET /resumes/. При остановке
+    воркера поток завершается событием shutdown.
+    """
+
+    async def event_stream():
+        async with change_feed.subscribe(current_user.id) as queue:
+            while True:
+                event = await change_feed.next_event(
+                    queue, timeout=settings.change_feed_heartbeat_seconds
+                )
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                if event is SHUTDOWN_EVENT:
+                    return
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/resumes/ws", dependencies=[Depends(query_budget(1))])
+async def resume_events_websocket(websocket: WebSocket, token: str):
+    """
+    WebSocket-вариант потока событий. Токен передается параметром запроса,
+    так как браузер не позволяет задать заголовок Authorization.
+    При остановке воркера отправляется событие shutdown и соединение
+    закрывается с кодом 1001.
+    """
+
+    async with get_session_maker()() as db:
+        try:
+            current_user = await AuthService.get_current_user(token, db)
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+    await websocket.accept()
+    async with change_feed.subscribe(current_user.id) as queue:
+        # Чтение из сокета нужно, чтобы вовремя заметить отключение клиента.
+        receiver = asyncio.ensure_future(websocket.receive_text())
+        getter = None
+        try:
+            while True:
+                if getter is None:
+                    getter = asyncio.ensure_future(change_feed.next_event(queue))
+                done, _ = await asyncio.wait(
+                    {getter, receiver}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if getter in done:
+                    event = getter.result()
+                    getter = None
+                    await websocket.send_json(event)
+                    if event is SHUTDOWN_EVENT:
+                        await websocket.close(code=status.WS_1001_GOING_AWAY)
+                        return
+                if receiver in done:
+                    receiver.result()
+                    receiver = asyncio.ensure_future(websocket.receive_text())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            receiver.cancel()
+            if getter is not None:
+                getter.cancel()
@@ -0,0 +1,63 @@
+from app.config import settings
+from app.db import check_db, get_pool_status
+from app.querybudget import query_budget
+from app.services.archive import partitions_ahead
+from fastapi import APIRouter, Depends, Request, status
+from starlette.responses import JSONResponse
+
+router = APIRouter(tags=["health"])
+
+PROBE_PATHS = frozenset({"/healthz", "/readyz"})
+
+
+@router.get("/healthz", dependencies=[Depends(query_budget(0))])
+async def liveness():
+    """Проверка живости процесса: не обращается ни к БД, ни к другим ресурсам."""
+
+    return {"status": "ok"}
+
+
+@router.get("/readyz", dependencies=[Depends(query_budget(1))])
+async def readiness(request: Request):
+    """
+    Проверяет готовность воркера принимать трафик: завершен ли прогрев,
+    отвечает ли БД на SELECT 1 за отведенное время и не насыщен ли пул.
+    """
+
+    state = request.app.state
+    warm = dict(state.warm)
+    pool = get_pool_status()
+    pool["saturated"] = pool["saturation"] >= settings.readiness_max_pool_saturation
+    if pool["saturated"]:
+        # SELECT 1 ждал бы свободного соединения и выдал бы занятый воркер
+        # за недоступную БД, поэтому при насыщенном пуле БД не проверяется.
+        database = {"ok": None, "skipped": "pool saturated"}
+    else:
+        try:
+            latency = await check_db(settings.readiness_db_timeout_seconds)
+            database = {"ok": True, "latency_ms": round(latency * 1000, 2)}
+        except TimeoutError:
+            database = {"ok": False, "error": "timeout"}
+        except Exception as ex:
+            database = {"ok": False, "error": type(ex).__name__}
+    ready = warm["bcrypt"] and database["ok"] is True and not pool["saturated"]
+    ahead = partitions_ahead()
+    partitions = {
+        "ahead": ahead,
+        "required": settings.improvements_partitions_ahead,
+        "ok": ahead is None or ahead >= settings.improvements_partitions_ahead,
+    }
+    return JSONResponse(
+        content={
+            "ready": ready,
+            "warm": warm,
+            "database": database,
+            "pool": pool,
+            "improvement_partitions": partitions,
+            "in_flight_requests": state.in_flight,
+            "background_jobs": sum(not job.done() for job in state.jobs),
+        },
+        status_code=(
+            status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+    )
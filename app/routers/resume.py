@@ -1,8 +1,9 @@
 from typing import Annotated, List
 
 from app.db import get_db
+from app.querybudget import query_budget
 from app.schemas import Resume as ResumeSchema
-from app.schemas import ResumeCreate, UserResponse
+from app.schemas import ResumeCreate, ResumeUpdate, UserResponse
 from app.services.auth import AuthService
 from app.services.resume import ResumeService
 from fastapi import APIRouter, Depends, status
@@ -11,7 +12,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 router = APIRouter(prefix="/resumes", tags=["resumes"])
 
 
-@router.get("/", response_model=List[ResumeSchema])
+@router.get(
+    "/", response_model=List[ResumeSchema], dependencies=[Depends(query_budget(2))]
+)
 async def get_user_resumes(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: UserResponse = Depends(AuthService.get_current_user),
@@ -20,7 +23,9 @@ async def get_user_resumes(
     return await ResumeService.get_user_resumes(db, current_user.id)
 
 
-@router.get("/{resume_id}", response_model=ResumeSchema)
+@router.get(
+    "/{resume_id}", response_model=ResumeSchema, dependencies=[Depends(query_budget(2))]
+)
 async def get_resume(
     resume_id: int,
     db: Annotated[AsyncSession, Depends(get_db)],
@@ -30,7 +35,12 @@ async def get_resume(
     return await ResumeService.get_resume_by_id(db, resume_id, current_user.id)
 
 
-@router.post("/", response_model=ResumeSchema, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=ResumeSchema,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(query_budget(3))],
+)
 async def create_resume(
     resume_data: ResumeCreate,
     db: Annotated[AsyncSession, Depends(get_db)],
@@ -40,10 +50,12 @@ async def create_resume(
     return await ResumeService.create_resume(db, resume_data, current_user.id)
 
 
-@router.put("/{resume_id}", response_model=ResumeSchema)
+@router.put(
+    "/{resume_id}", response_model=ResumeSchema, dependencies=[Depends(query_budget(4))]
+)
 async def update_resume(
     resume_id: int,
-    resume_data: ResumeCreate,
+    resume_data: ResumeUpdate,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: UserResponse = Depends(AuthService.get_current_user),
 ):
@@ -53,7 +65,11 @@ async def update_resume(
     )
 
 
-@router.delete("/{resume_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{resume_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(query_budget(4))],
+)
 async def delete_resume(
     resume_id: int,
     db: Annotated[AsyncSession, Depends(get_db)],
@@ -4,8 +4,10 @@ from typing import Annotated
 from app.config import settings
 from app.db import get_db
 from app.models.user import User
+from app.querybudget import query_budget
 from app.schemas import CreateUser, TokenData, UserResponse
-from app.services.auth import AuthService, bcrypt_context, oauth2_scheme
+from app.services.auth import AuthService, get_bcrypt_context, oauth2_scheme
+from app.tracing import span
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from loguru import logger
@@ -15,7 +17,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/register", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/register",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(query_budget(2))],
+)
 async def create_user(
     db: Annotated[AsyncSession, Depends(get_db)], create_user: CreateUser
 ):
@@ -33,11 +39,13 @@ async def create_user(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username or email already exists",
             )
+        with span("auth.bcrypt_hash"):
+            hashed_password = get_bcrypt_context().hash(create_user.password)
         await db.execute(
             insert(User).values(
                 username=create_user.username,
                 email=create_user.email,
-                hashed_password=bcrypt_context.hash(create_user.password),
+                hashed_password=hashed_password,
             )
         )
         await db.commit()
@@ -50,7 +58,9 @@ async def create_user(
         )
 
 
-@router.post("/token", response_model=TokenData)
+@router.post(
+    "/token", response_model=TokenData, dependencies=[Depends(query_budget(1))]
+)
 async def login(
     db: Annotated[AsyncSession, Depends(get_db)],
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
@@ -70,14 +80,14 @@ async def login(
     )
 
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me", response_model=UserResponse, dependencies=[Depends(query_budget(1))])
 async def read_current_user(user: UserResponse = Depends(AuthService.get_current_user)):
     """Получает данные текущего авторизованного пользователя."""
 
     return user
 
 
-@router.get("/check_token")
+@router.get("/check_token", dependencies=[Depends(query_budget(1))])
 async def check_token_validity(
     user: UserResponse = Depends(AuthService.get_current_user),
 ):
@@ -86,7 +96,11 @@ async def check_token_validity(
     return {"is_valid": True, "user": user.model_dump(), "message": "Token is valid"}
 
 
-@router.get("/users/{user_id}", response_model=UserResponse)
+@router.get(
+    "/users/{user_id}",
+    response_model=UserResponse,
+    dependencies=[Depends(query_budget(2))],
+)
 async def get_user_profile(
     user_id: int,
     db: Annotated[AsyncSession, Depends(get_db)],
@@ -110,7 +124,11 @@ async def get_user_profile(
     )
 
 
-@router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/users/{user_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(query_budget(3))],
+)
 async def delete_user(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[UserResponse, Depends(AuthService.get_current_user)],
@@ -134,7 +152,9 @@ async def delete_user(
     await db.commit()
 
 
-@router.get("/users", response_model=list[UserResponse])
+@router.get(
+    "/users", response_model=list[UserResponse], dependencies=[Depends(query_budget(1))]
+)
 async def get_users(
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
@@ -30,9 +30,14 @@ class ResumeCreate(ResumeBase):
     pass
 
 
+class ResumeUpdate(ResumeBase):
+    version: Optional[int] = None
+
+
 class Resume(ResumeBase):
     id: int
     owner_id: int
+    version: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
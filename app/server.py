@@ -0,0 +1,83 @@
+import math
+import os
+from typing import Optional
+
+import uvicorn
+from app.config import settings
+from loguru import logger
+
+
+def _cgroup_cpu_limit() -> Optional[int]:
+    """Лимит CPU контейнера (квота cgroup), округленный вверх, или None."""
+
+    try:
+        # cgroup v2: "<quota> <period>" или "max <period>".
+        with open("/sys/fs/cgroup/cpu.max") as file:
+            quota, period = file.read().split()[:2]
+        if quota == "max":
+            return None
+        return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1: квота -1 означает отсутствие ограничения.
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as file:
+            quota = int(file.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as file:
+            period = int(file.read())
+    except (OSError, ValueError):
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return max(1, math.ceil(quota / period))
+
+
+def get_cpu_count() -> int:
+    """Число ядер, доступных процессу, с учетом affinity и квоты cgroup."""
+
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    return min(count, limit) if limit else count
+
+
+def get_workers_count() -> int:
+    """
+    Количество воркеров: из настроек или по числу доступных ядер. Каждый
+    воркер держит до DB_POOL_SIZE + DB_MAX_OVERFLOW соединений пула и одно
+    LISTEN-соединение, поэтому число воркеров ограничивается так, чтобы
+    все они укладывались в DB_MAX_CONNECTIONS.
+    """
+
+    workers = settings.web_workers or get_cpu_count()
+    per_worker = settings.db_pool_size + settings.db_max_overflow + 1
+    allowed = max(1, settings.db_max_connections // per_worker)
+    if workers > allowed:
+        logger.warning(
+            f"{workers} workers x {per_worker} connections exceed "
+            f"DB_MAX_CONNECTIONS={settings.db_max_connections}, "
+            f"starting {allowed} workers"
+        )
+        workers = allowed
+    return workers
+
+
+def main() -> None:
+    """Запускает приложение в production-режиме на нескольких воркерах."""
+
+    uvicorn.run(
+        "app.main:app",
+        host=settings.web_host,
+        port=settings.web_port,
+        workers=get_workers_count(),
+        loop=settings.web_loop,
+        http=settings.web_http,
+        timeout_graceful_shutdown=settings.web_graceful_shutdown_seconds,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
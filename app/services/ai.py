@@ -2,6 +2,12 @@ from typing import List
 
 from app.models.resume import Resume
 from app.models.resume import ResumeImprovement as ResumeImprovementModel
+from app.schemas import Resume as ResumeSchema
+from app.services.archive import retention_cutoff
+from app.services.cache import resume_cache
+from app.services.events import ResumeEventService
+from app.services.resume import ResumeService
+from app.tracing import traced
 from fastapi import HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -18,6 +24,7 @@ class AIService:
         return f"{content} [Improved with AI - Enhanced content structure and keywords]"
 
     @staticmethod
+    @traced("AIService.improve_and_save_resume")
     async def improve_and_save_resume(
         db: AsyncSession, resume_id: int, user_id: int
     ) -> dict:
@@ -35,18 +42,29 @@ class AIService:
                 status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found"
             )
         improved_content = AIService.improve_resume_content(resume.content)
-        resume.content = improved_content
-        await db.commit()
-        await db.refresh(resume)
+        resume = await ResumeService.update_resume_versioned(
+            db, resume_id, user_id, resume.version, content=improved_content
+        )
         improvement = ResumeImprovementModel(
             resume_id=resume_id, improved_content=improved_content
         )
         db.add(improvement)
+        await db.flush()
+        await ResumeEventService.notify(
+            db,
+            "resume.improved",
+            user_id,
+            resume_id,
+            version=resume.version,
+            improvement_id=improvement.id,
+        )
+        await resume_cache.invalidate(user_id, resume_id)
         await db.commit()
-        await db.refresh(improvement)
+        await resume_cache.set(ResumeSchema.from_orm(resume))
         return {"resume": resume, "improvement": improvement}
 
     @staticmethod
+    @traced("AIService.get_resume_improvements")
     async def get_resume_improvements(
         db: AsyncSession, resume_id: int, user_id: int
     ) -> List[ResumeImprovementModel]:
@@ -57,9 +75,14 @@ class AIService:
         )
         if not result.scalar_one_or_none():
             raise HTTPException(status_code=404, detail="Resume not found")
+        query = select(ResumeImprovementModel).where(
+            ResumeImprovementModel.resume_id == resume_id
+        )
+        cutoff = retention_cutoff()
+        if cutoff:
+            # Ограничение по created_at отсекает архивируемые секции.
+            query = query.where(ResumeImprovementModel.created_at >= cutoff)
         result = await db.execute(
-            select(ResumeImprovementModel)
-            .where(ResumeImprovementModel.resume_id == resume_id)
-            .order_by(ResumeImprovementModel.created_at.desc())
+            query.order_by(ResumeImprovementModel.created_at.desc())
         )
         return result.scalars().all()
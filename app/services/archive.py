@@ -0,0 +1,330 @@
+import asyncio
+import csv
+import gzip
+import os
+import re
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from app.config import settings
+from app.db import get_engine
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+PARTITION_PREFIX = "resume_improvements_p"
+PARTITION_NAME = re.compile(rf"^{PARTITION_PREFIX}(\d{{4}})(\d{{2}})$")
+ARCHIVE_LOCK_ID = 0x7265_7375  # pg_advisory_lock: один архиватор на все воркеры
+PARTITIONS_LOCK_ID = 0x7265_7376  # pg_advisory_xact_lock: создание секций по очереди
+EXPORT_COLUMNS = ("id", "resume_id", "improved_content", "created_at")
+
+
+def month_start(value: datetime) -> datetime:
+    """Возвращает начало месяца (UTC) для указанного момента времени."""
+
+    value = value.astimezone(timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Сдвигает начало месяца на указанное число месяцев."""
+
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def retention_cutoff() -> Optional[datetime]:
+    """Граница хранения истории улучшений или None, если срок не ограничен."""
+
+    if not settings.improvements_retention_months:
+        return None
+    return add_months(
+        month_start(datetime.now(timezone.utc)),
+        -settings.improvements_retention_months,
+    )
+
+
+# Начало последней известной секции: по нему считается запас секций
+# наперед, даже если обслуживание давно не выполнялось успешно.
+_latest_partition: Optional[datetime] = None
+
+
+def partitions_ahead() -> Optional[int]:
+    """
+    Число месячных секций после текущего месяца по данным последней
+    проверки или None, если проверки еще не было.
+    """
+
+    if _latest_partition is None:
+        return None
+    current = month_start(datetime.now(timezone.utc))
+    return (_latest_partition.year - current.year) * 12 + (
+        _latest_partition.month - current.month
+    )
+
+
+def check_partitions_ahead() -> bool:
+    """Пишет в лог ошибку, если секций наперед меньше IMPROVEMENTS_PARTITIONS_AHEAD."""
+
+    ahead = partitions_ahead()
+    if ahead is not None and ahead < settings.improvements_partitions_ahead:
+        logger.error(
+            f"Only {ahead} future resume_improvements partitions exist "
+            f"(IMPROVEMENTS_PARTITIONS_AHEAD={settings.improvements_partitions_ahead}); "
+            "inserts will fail once the last partition is in the past"
+        )
+        return False
+    return True
+
+
+class ImprovementArchiveService:
+    """Сервис для секционирования, очистки и архивации истории улучшений."""
+
+    @staticmethod
+    async def list_partitions(
+        conn: AsyncConnection,
+    ) -> List[Tuple[str, datetime, bool]]:
+        """
+        Возвращает месячные секции resume_improvements, начало их диапазона
+        и признак незавершенного отсоединения (DETACH ... CONCURRENTLY).
+        """
+
+        result = await conn.execute(
+            text(
+                """
+                SELECT c.relname, i.inhdetachpending
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'resume_improvements'::regclass
+                """
+            )
+        )
+        partitions = []
+        for name, detach_pending in result:
+            match = PARTITION_NAME.match(name)
+            if match:
+                start = datetime(
+                    int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc
+                )
+                partitions.append((name, start, detach_pending))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    @staticmethod
+    async def ensure_partitions(conn: AsyncConnection, months_ahead: int) -> None:
+        """
+        Создает секции на текущий и следующие months_ahead месяцев.
+        Воркеры выполняют это по очереди (блокировка до конца транзакции),
+        не дожидаясь архиватора.
+        """
+
+        global _latest_partition
+        await conn.execute(
+            text("SELECT pg_advisory_xact_lock(:id)"), {"id": PARTITIONS_LOCK_ID}
+        )
+        current = month_start(datetime.now(timezone.utc))
+        for offset in range(months_ahead + 1):
+            start = add_months(current, offset)
+            end = add_months(start, 1)
+            await conn.execute(
+                text(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS {PARTITION_PREFIX}{start:%Y%m}
+                    PARTITION OF resume_improvements
+                    FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')
+                    """
+                )
+            )
+        await conn.commit()
+        partitions = await ImprovementArchiveService.list_partitions(conn)
+        await conn.commit()
+        if partitions:
+            _latest_partition = partitions[-1][1]
+
+    @staticmethod
+    def _write_archive(path: str, rows: List[tuple], append: bool) -> None:
+        with gzip.open(path, "at" if append else "wt", newline="") as file:
+            writer = csv.writer(file)
+            if not append:
+                writer.writerow(EXPORT_COLUMNS)
+            writer.writerows(rows)
+
+    @staticmethod
+    async def _export(conn: AsyncConnection, query: str, path: str) -> int:
+        """Выгружает результат запроса в сжатый CSV, возвращает число строк."""
+
+        tmp_path = f"{path}.tmp"
+        exported = 0
+        result = await conn.stream(text(query))
+        async for rows in result.partitions(1000):
+            await asyncio.to_thread(
+                ImprovementArchiveService._write_archive,
+                tmp_path,
+                [tuple(row) for row in rows],
+                exported > 0,
+            )
+            exported += len(rows)
+        if exported == 0:
+            await asyncio.to_thread(
+                ImprovementArchiveService._write_archive, tmp_path, [], False
+            )
+        os.replace(tmp_path, path)
+        return exported
+
+    @staticmethod
+    async def _detach_and_drop(name: str, detach_pending: bool) -> None:
+        """
+        Отсоединяет секцию без блокировки записи в resume_improvements
+        и удаляет ее. DETACH ... CONCURRENTLY нельзя выполнять в транзакции,
+        поэтому используется отдельное соединение в режиме autocommit.
+        Если прошлое отсоединение прервалось, оно завершается через FINALIZE.
+        """
+
+        mode = "FINALIZE" if detach_pending else "CONCURRENTLY"
+        async with get_engine().connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(
+                text(f"ALTER TABLE resume_improvements DETACH PARTITION {name} {mode}")
+            )
+            await conn.execute(text(f"DROP TABLE {name}"))
+
+    @staticmethod
+    async def archive_old_partitions(
+        conn: AsyncConnection, cutoff: datetime, archive_dir: str
+    ) -> List[str]:
+        """
+        Выгружает секции, целиком лежащие раньше cutoff, в сжатые файлы
+        и удаляет их из таблицы.
+        """
+
+        archived = []
+        partitions = await ImprovementArchiveService.list_partitions(conn)
+        for name, start, detach_pending in partitions:
+            if add_months(start, 1) > cutoff:
+                continue
+            path = os.path.join(archive_dir, f"{name}.csv.gz")
+            count = await ImprovementArchiveService._export(
+                conn,
+                f"SELECT {', '.join(EXPORT_COLUMNS)} FROM {name} ORDER BY id",
+                path,
+            )
+            # Завершаем транзакцию чтения: DETACH ... CONCURRENTLY ждет ее.
+            await conn.commit()
+            await ImprovementArchiveService._detach_and_drop(name, detach_pending)
+            logger.info(f"Archived partition {name} ({count} rows) to {path}")
+            archived.append(name)
+        return archived
+
+    @staticmethod
+    async def prune_excess(
+        conn: AsyncConnection, keep_last: int, archive_dir: str
+    ) -> int:
+        """
+        Оставляет для каждого резюме только keep_last последних улучшений,
+        удаленные записи сохраняются в сжатый файл.
+        """
+
+        await conn.execute(
+            text(
+                f"""
+                CREATE TEMPORARY TABLE improvements_excess ON COMMIT DROP AS
+                SELECT id, created_at FROM (
+                    SELECT id, created_at, row_number() OVER (
+                        PARTITION BY resume_id ORDER BY created_at DESC, id DESC
+                    ) AS position
+                    FROM resume_improvements
+                ) ranked
+                WHERE position > {int(keep_last)}
+                """
+            )
+        )
+        count = await conn.scalar(text("SELECT count(*) FROM improvements_excess"))
+        if not count:
+            await conn.rollback()
+            return 0
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(archive_dir, f"resume_improvements_excess_{stamp}.csv.gz")
+        columns = ", ".join(f"ri.{column}" for column in EXPORT_COLUMNS)
+        await ImprovementArchiveService._export(
+            conn,
+            f"SELECT {columns} FROM resume_improvements ri "
+            "JOIN improvements_excess e USING (id, created_at) ORDER BY ri.id",
+            path,
+        )
+        await conn.execute(
+            text(
+                """
+                DELETE FROM resume_improvements ri
+                USING improvements_excess e
+                WHERE ri.id = e.id AND ri.created_at = e.created_at
+                """
+            )
+        )
+        await conn.commit()
+        logger.info(f"Pruned {count} excess improvements to {path}")
+        return count
+
+    @staticmethod
+    async def run() -> None:
+        """Один проход обслуживания: секции впереди, очистка и архивация."""
+
+        async with get_engine().connect() as conn:
+            # Секции создаются в каждом проходе, не завися от архивации.
+            try:
+                await ImprovementArchiveService.ensure_partitions(
+                    conn, settings.improvements_partitions_ahead
+                )
+            except Exception as ex:
+                await conn.rollback()
+                logger.error(f"Creating resume_improvements partitions failed: {ex}")
+            check_partitions_ahead()
+            locked = await conn.scalar(
+                text("SELECT pg_try_advisory_lock(:id)"), {"id": ARCHIVE_LOCK_ID}
+            )
+            await conn.commit()
+            if not locked:
+                return
+            try:
+                cutoff = retention_cutoff()
+                if not (settings.improvements_keep_last or cutoff):
+                    return
+                archive_dir = settings.improvements_archive_dir
+                if not archive_dir:
+                    # Без надежного хранилища выгрузка пропала бы вместе
+                    # с контейнером, поэтому данные не удаляются.
+                    logger.warning(
+                        "IMPROVEMENTS_ARCHIVE_DIR is not set, "
+                        "skipping improvements pruning and archiving"
+                    )
+                    return
+                os.makedirs(archive_dir, exist_ok=True)
+                if settings.improvements_keep_last:
+                    await ImprovementArchiveService.prune_excess(
+                        conn, settings.improvements_keep_last, archive_dir
+                    )
+                if cutoff:
+                    await ImprovementArchiveService.archive_old_partitions(
+                        conn, cutoff, archive_dir
+                    )
+            finally:
+                await conn.rollback()
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:id)"), {"id": ARCHIVE_LOCK_ID}
+                )
+                await conn.commit()
+
+
+async def improvements_retention_loop(stop: asyncio.Event) -> None:
+    """Периодически запускает обслуживание истории улучшений до остановки воркера."""
+
+    while not stop.is_set():
+        try:
+            await ImprovementArchiveService.run()
+        except Exception as ex:
+            logger.error(f"Improvements retention run failed: {ex}")
+            check_partitions_ahead()
+        try:
+            await asyncio.wait_for(
+                stop.wait(), timeout=settings.improvements_archive_interval_seconds
+            )
+        except TimeoutError:
+            pass
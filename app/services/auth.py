@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Annotated
 
 import jwt
@@ -6,21 +7,39 @@ from app.config import settings
 from app.db import get_db
 from app.models.user import User
 from app.schemas import UserResponse
+from app.tracing import span, traced
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 
+@lru_cache
+def get_bcrypt_context():
+    """
+    Создает CryptContext при первом обращении: импорт passlib и загрузка
+    bcrypt-бэкенда не должны замедлять старт приложения.
+    """
+
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def warm_up_bcrypt() -> None:
+    """Загружает bcrypt-бэкенд заранее, чтобы первый логин не платил за это."""
+
+    get_bcrypt_context().dummy_verify()
+
+
 class AuthService:
     """Сервис для работы с аутентификацией и авторизацией"""
 
     @staticmethod
+    @traced("AuthService.get_current_user")
     async def get_current_user(
         token: Annotated[str, Depends(oauth2_scheme)],
         db: Annotated[AsyncSession, Depends(get_db)],
@@ -28,18 +47,20 @@ class AuthService:
         """Получает текущего пользователя по JWT токену."""
 
         try:
-            payload = jwt.decode(
-                token, settings.secret_key, algorithms=[settings.algorithm]
-            )
+            with span("auth.jwt_decode"):
+                payload = jwt.decode(
+                    token, settings.secret_key, algorithms=[settings.algorithm]
+                )
             user_id: int | None = payload.get("id")
             if not user_id:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid token",
                 )
-            user = await db.scalar(
-                select(User).where(User.id == user_id, User.is_active == True)
-            )
+            with span("auth.user_lookup"):
+                user = await db.scalar(
+                    select(User).where(User.id == user_id, User.is_active == True)
+                )
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -61,6 +82,7 @@ class AuthService:
             )
 
     @staticmethod
+    @traced("AuthService.authenticate_user")
     async def authenticate_user(
         db: Annotated[AsyncSession, Depends(get_db)], username: str, password: str
     ) -> User:
@@ -74,7 +96,9 @@ class AuthService:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found",
             )
-        if not bcrypt_context.verify(password, user.hashed_password):
+        with span("auth.bcrypt_verify"):
+            verified = get_bcrypt_context().verify(password, user.hashed_password)
+        if not verified:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect password",
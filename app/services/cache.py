@@ -0,0 +1,375 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Protocol, Set, Tuple
+
+from app.config import settings
+from app.schemas import Resume as ResumeSchema
+from loguru import logger
+from pydantic import ValidationError
+
+CacheKey = Tuple[int, int]
+
+# Атомарная запись в Redis: значение не заменяет запись с большей версией.
+REDIS_SET_IF_NEWER = """
+local current = redis.call('GET', KEYS[1])
+if current then
+    local ok, entry = pcall(cjson.decode, current)
+    if ok and type(entry) == 'table' and tonumber(entry['version'])
+        and tonumber(entry['version']) > tonumber(ARGV[2]) then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+return 1
+"""
+
+
+def tombstone(version: int) -> str:
+    """Запись разделяемого кэша об удаленном резюме (не дает вернуть старую)."""
+
+    return json.dumps({"version": version, "deleted": True})
+
+
+def is_tombstone(value: str) -> bool:
+    try:
+        entry = json.loads(value)
+    except ValueError:
+        return False
+    return isinstance(entry, dict) and bool(entry.get("deleted"))
+
+
+def entry_version(value: str) -> Optional[int]:
+    """Версия резюме из сериализованной записи кэша или None."""
+
+    try:
+        return int(json.loads(value)["version"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class SharedCacheBackend(Protocol):
+    """Интерфейс разделяемого между воркерами уровня кэша."""
+
+    async def get(self, key: str) -> Optional[str]: ...
+
+    async def set_if_newer(
+        self, key: str, value: str, version: int, ttl: int
+    ) -> bool: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+class InMemorySharedCache:
+    """Локальная замена разделяемого кэша (для тестов и разработки)."""
+
+    def __init__(self) -> None:
+        self._data: Dict[str, Tuple[str, float]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    async def set_if_newer(self, key: str, value: str, version: int, ttl: int) -> bool:
+        current = await self.get(key)
+        if current is not None and (entry_version(current) or 0) > version:
+            return False
+        self._data[key] = (value, time.monotonic() + ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+
+class RedisSharedCache:
+    """Разделяемый уровень кэша в Redis."""
+
+    def __init__(self, url: str) -> None:
+        from redis import asyncio as aioredis
+
+        self._client = aioredis.from_url(url, decode_responses=True)
+        self._set_if_newer = self._client.register_script(REDIS_SET_IF_NEWER)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def set_if_newer(self, key: str, value: str, version: int, ttl: int) -> bool:
+        return bool(await self._set_if_newer(keys=[key], args=[value, version, ttl]))
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+
+class ResumeCache:
+    """
+    Кэш сериализованных резюме по ключу (owner_id, resume_id).
+
+    Первый уровень - LRU в памяти процесса, второй - необязательный
+    разделяемый кэш. Одновременные промахи по одному ключу приводят
+    к единственной загрузке из БД.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: int,
+        shared: Optional[SharedCacheBackend] = None,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared = shared
+        # Значение: (JSON резюме, его версия, момент устаревания).
+        self._local: "OrderedDict[CacheKey, Tuple[str, int, float]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+        self._stale: Set[CacheKey] = set()
+        # Минимальная допустимая версия по ключу из событий об изменениях:
+        # (версия, момент устаревания). Живет дольше записей кэша, чтобы
+        # отсечь старое значение, записанное в разделяемый кэш после события.
+        self._floors: "OrderedDict[CacheKey, Tuple[int, float]]" = OrderedDict()
+
+    @staticmethod
+    def _shared_key(key: CacheKey) -> str:
+        return f"resume:{key[0]}:{key[1]}"
+
+    def _mark_stale(self, key: CacheKey) -> None:
+        # Загрузка, начатая до записи, не должна перезаписать кэш старыми данными.
+        if key in self._inflight:
+            self._stale.add(key)
+
+    def _floor(self, key: CacheKey) -> int:
+        item = self._floors.get(key)
+        if item is None:
+            return 0
+        version, expires_at = item
+        if expires_at < time.monotonic():
+            del self._floors[key]
+            return 0
+        return version
+
+    def raise_floor(self, owner_id: int, resume_id: int, version: int) -> None:
+        """
+        Запоминает, что версии резюме ниже version устарели: такие значения
+        больше не отдаются и не кладутся в кэш ни с одного уровня.
+        """
+
+        key = (owner_id, resume_id)
+        if version <= self._floor(key):
+            return
+        self._floors[key] = (version, time.monotonic() + 2 * self.ttl)
+        self._floors.move_to_end(key)
+        while len(self._floors) > self.max_size:
+            self._floors.popitem(last=False)
+        local = self._local.get(key)
+        if local is not None and local[1] < version:
+            del self._local[key]
+        self._mark_stale(key)
+
+    def _get_local(self, key: CacheKey) -> Optional[Tuple[str, int]]:
+        item = self._local.get(key)
+        if item is None:
+            return None
+        value, version, expires_at = item
+        if expires_at < time.monotonic() or version < self._floor(key):
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return value, version
+
+    def _set_local(self, key: CacheKey, value: str, version: int) -> None:
+        self._local[key] = (value, version, time.monotonic() + self.ttl)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def _get_shared(self, key: CacheKey) -> Optional[str]:
+        if self.shared is None:
+            return None
+        try:
+            return await self.shared.get(self._shared_key(key))
+        except Exception as ex:
+            logger.warning(f"Shared cache get failed: {ex}")
+            return None
+
+    async def _set_shared(self, key: CacheKey, value: str, version: int) -> bool:
+        """Пишет в разделяемый кэш; False, если там уже более новая версия."""
+
+        if self.shared is None:
+            return True
+        try:
+            return await self.shared.set_if_newer(
+                self._shared_key(key), value, version, self.ttl
+            )
+        except Exception as ex:
+            logger.warning(f"Shared cache set failed: {ex}")
+            return True
+
+    async def _delete_shared(self, key: CacheKey) -> None:
+        if self.shared is None:
+            return
+        try:
+            await self.shared.delete(self._shared_key(key))
+        except Exception as ex:
+            logger.warning(f"Shared cache delete failed: {ex}")
+
+    async def get(self, owner_id: int, resume_id: int) -> Optional[ResumeSchema]:
+        """Возвращает резюме из кэша или None."""
+
+        key = (owner_id, resume_id)
+        local = self._get_local(key)
+        value = local[0] if local is not None else await self._get_shared(key)
+        if value is None:
+            return None
+        if local is None and (
+            (entry_version(value) or 0) < self._floor(key) or is_tombstone(value)
+        ):
+            # Устаревшая версия или отметка об удалении: считаем промахом.
+            return None
+        try:
+            resume = ResumeSchema.model_validate_json(value)
+        except ValidationError:
+            # Запись в старом формате (например, после изменения схемы):
+            # удаляем ее с обоих уровней, иначе она вернется из разделяемого.
+            self._local.pop(key, None)
+            await self._delete_shared(key)
+            return None
+        if local is None:
+            self._set_local(key, value, resume.version)
+        return resume
+
+    async def set(self, resume: ResumeSchema) -> None:
+        """
+        Кладет резюме в оба уровня кэша, если в кэше нет более новой
+        версии (запоздавшая запись не откатывает чужое обновление).
+        """
+
+        self._mark_stale((resume.owner_id, resume.id))
+        await self._store(resume, from_load=False)
+
+    async def invalidate(self, owner_id: int, resume_id: int) -> None:
+        """Удаляет резюме из обоих уровней кэша."""
+
+        key = (owner_id, resume_id)
+        self._mark_stale(key)
+        self._local.pop(key, None)
+        await self._delete_shared(key)
+
+    async def remove(self, owner_id: int, resume_id: int, version: int) -> None:
+        """
+        Отмечает резюме удаленным после коммита: version - версия
+        удаления (на единицу больше последней версии резюме).
+        """
+
+        key = (owner_id, resume_id)
+        self.raise_floor(owner_id, resume_id, version)
+        self._local.pop(key, None)
+        if self.shared is None:
+            return
+        try:
+            await self.shared.set_if_newer(
+                self._shared_key(key), tombstone(version), version, self.ttl
+            )
+        except Exception as ex:
+            logger.warning(f"Shared cache delete failed: {ex}")
+
+    def invalidate_local(self, owner_id: int, resume_id: int) -> None:
+        """Удаляет резюме только из локального уровня кэша."""
+
+        key = (owner_id, resume_id)
+        self._mark_stale(key)
+        self._local.pop(key, None)
+
+    def clear(self) -> None:
+        """Очищает локальный уровень кэша."""
+
+        self._local.clear()
+        self._stale.update(self._inflight)
+
+    async def get_or_load(
+        self,
+        owner_id: int,
+        resume_id: int,
+        loader: Callable[[], Awaitable[ResumeSchema]],
+    ) -> ResumeSchema:
+        """
+        Возвращает резюме из кэша, при промахе загружает его через loader.
+        Загрузка идет в отдельной задаче, которую все конкурентные промахи
+        по ключу ждут через shield: отмена любого из запросов, включая
+        первый, не прерывает загрузку для остальных.
+        """
+
+        cached = await self.get(owner_id, resume_id)
+        if cached is not None:
+            return cached
+        key = (owner_id, resume_id)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader))
+            # Ошибка загрузки не должна теряться, если ждать ее уже некому.
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _store(self, resume: ResumeSchema, from_load: bool) -> None:
+        """
+        Кладет резюме в кэш, не заменяя более новую версию: в разделяемом
+        уровне сравнение и запись атомарны. Для загрузки из БД запись
+        отменяется, если ключ устарел (изменен или удален) во время ожидания.
+        """
+
+        key = (resume.owner_id, resume.id)
+        if resume.version < self._floor(key):
+            return
+        local = self._get_local(key)
+        if local is not None and local[1] > resume.version:
+            return
+        value = resume.model_dump_json()
+        if not await self._set_shared(key, value, resume.version):
+            logger.debug(
+                f"Skip caching resume {resume.id} v{resume.version}: "
+                "a newer version is already cached"
+            )
+            return
+        if from_load and key in self._stale:
+            # Пока шла запись, резюме изменили или удалили: убираем
+            # загруженное значение (в худшем случае это лишний промах).
+            await self._delete_shared(key)
+            return
+        local = self._get_local(key)
+        if local is None or local[1] <= resume.version:
+            self._set_local(key, value, resume.version)
+
+    async def _load(
+        self, key: CacheKey, loader: Callable[[], Awaitable[ResumeSchema]]
+    ) -> ResumeSchema:
+        # Ключ остается в _inflight до конца записи в кэш, чтобы изменения,
+        # пришедшие во время записи, тоже помечали загрузку устаревшей.
+        try:
+            resume = await loader()
+            if key not in self._stale:
+                await self._store(resume, from_load=True)
+            return resume
+        finally:
+            self._inflight.pop(key, None)
+            self._stale.discard(key)
+
+
+def _build_shared_backend() -> Optional[SharedCacheBackend]:
+    if not settings.resume_cache_redis_url:
+        return None
+    if settings.resume_cache_redis_url == "memory://":
+        return InMemorySharedCache()
+    return RedisSharedCache(settings.resume_cache_redis_url)
+
+
+resume_cache = ResumeCache(
+    max_size=settings.resume_cache_size,
+    ttl=settings.resume_cache_ttl_seconds,
+    shared=_build_shared_backend(),
+)
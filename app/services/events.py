@@ -0,0 +1,182 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+from uuid import uuid4
+
+from app.config import settings
+from app.services.cache import resume_cache
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+RESUME_CHANNEL = "resume_events"
+# Идентификатор воркера: свои события не сбрасывают только что обновленный кэш.
+WORKER_ID = uuid4().hex
+# Последнее событие потока перед закрытием при остановке воркера.
+SHUTDOWN_EVENT = {"type": "shutdown"}
+
+
+class ResumeEventService:
+    """Сервис для публикации событий об изменении резюме через NOTIFY."""
+
+    @staticmethod
+    async def notify(
+        db: AsyncSession, event_type: str, user_id: int, resume_id: int, **data
+    ) -> None:
+        """
+        Ставит событие в текущую транзакцию: Postgres доставит его
+        слушателям только после коммита.
+        """
+
+        payload = {
+            "type": event_type,
+            "user_id": user_id,
+            "resume_id": resume_id,
+            "origin": WORKER_ID,
+            **data,
+        }
+        await db.execute(select(func.pg_notify(RESUME_CHANNEL, json.dumps(payload))))
+
+
+class ChangeFeed:
+    """
+    Раздает события из общего для воркера LISTEN-соединения подписчикам
+    (WebSocket/SSE), сгруппированным по пользователю.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self.closing = asyncio.Event()
+
+    @property
+    def subscribers_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def open(self) -> None:
+        """Сбрасывает признак остановки (при старте воркера)."""
+
+        self.closing = asyncio.Event()
+
+    def close(self) -> None:
+        """Просит все открытые потоки завершиться (при остановке воркера)."""
+
+        self.closing.set()
+
+    async def next_event(
+        self, queue: asyncio.Queue, timeout: Optional[float] = None
+    ) -> Optional[dict]:
+        """
+        Ждет следующее событие подписчика. Возвращает None по таймауту
+        и SHUTDOWN_EVENT, если воркер останавливается.
+        """
+
+        if self.closing.is_set():
+            return SHUTDOWN_EVENT
+        getter = asyncio.ensure_future(queue.get())
+        closer = asyncio.ensure_future(self.closing.wait())
+        try:
+            await asyncio.wait(
+                {getter, closer}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            getter.cancel()
+            closer.cancel()
+        if getter.done() and not getter.cancelled():
+            return getter.result()
+        if self.closing.is_set():
+            return SHUTDOWN_EVENT
+        return None
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[asyncio.Queue]:
+        """Регистрирует очередь событий пользователя на время подключения."""
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def publish(self, event: dict) -> None:
+        """Передает событие всем подписчикам его владельца."""
+
+        if event.get("version") is not None:
+            # Версии ниже пришедшей больше не попадут в кэш этого воркера,
+            # даже если разделяемый кэш еще хранит старое значение.
+            resume_cache.raise_floor(
+                event["user_id"], event["resume_id"], event["version"]
+            )
+        if event.get("origin") != WORKER_ID:
+            resume_cache.invalidate_local(event["user_id"], event["resume_id"])
+        for queue in self._subscribers.get(event["user_id"], ()):
+            if queue.full():
+                # Медленный клиент теряет самые старые события, а не блокирует рассылку.
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _on_notification(self, connection, pid, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Malformed {channel} payload: {payload!r}")
+            return
+        self.publish(event)
+
+    async def listen(self, stop: asyncio.Event) -> None:
+        """
+        Держит одно LISTEN-соединение на воркер и переподключается
+        при обрыве, пока не установлен stop.
+        """
+
+        import asyncpg
+
+        dsn = (
+            make_url(settings.database_url)
+            .set(drivername="postgresql")
+            .render_as_string(hide_password=False)
+        )
+        delay = 1.0
+        while not stop.is_set():
+            connection: Optional[asyncpg.Connection] = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(RESUME_CHANNEL, self._on_notification)
+                delay = 1.0
+                logger.info(f"Listening on {RESUME_CHANNEL}")
+                stop_waiter = asyncio.ensure_future(stop.wait())
+                lost_waiter = asyncio.ensure_future(lost.wait())
+                try:
+                    await asyncio.wait(
+                        {stop_waiter, lost_waiter},
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                finally:
+                    stop_waiter.cancel()
+                    lost_waiter.cancel()
+                if not stop.is_set():
+                    # Во время обрыва события могли потеряться.
+                    resume_cache.clear()
+                    logger.warning(f"{RESUME_CHANNEL} listener connection lost")
+            except Exception as ex:
+                logger.error(f"{RESUME_CHANNEL} listener failed: {ex}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            if not stop.is_set():
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=delay)
+                except TimeoutError:
+                    delay = min(delay * 2, 30.0)
+
+
+change_feed = ChangeFeed(queue_size=settings.change_feed_queue_size)
@@ -1,10 +1,14 @@
 from typing import List
 
+from app.db import get_session_maker
 from app.models.resume import Resume
 from app.schemas import Resume as ResumeSchema
-from app.schemas import ResumeCreate
+from app.schemas import ResumeCreate, ResumeUpdate
+from app.services.cache import resume_cache
+from app.services.events import ResumeEventService
+from app.tracing import traced
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
@@ -13,6 +17,7 @@ class ResumeService:
     """Сервис для работы с резюме."""
 
     @staticmethod
+    @traced("ResumeService.get_user_resumes")
     async def get_user_resumes(db: AsyncSession, user_id: int) -> List[ResumeSchema]:
         """Получает все резюме пользователя."""
 
@@ -21,22 +26,35 @@ class ResumeService:
         return [ResumeSchema.from_orm(resume) for resume in resumes]
 
     @staticmethod
+    @traced("ResumeService.get_resume_by_id")
     async def get_resume_by_id(
         db: AsyncSession, resume_id: int, user_id: int
     ) -> ResumeSchema:
-        """Получает резюме по ID."""
+        """Получает резюме по ID (через кэш)."""
 
-        result = await db.execute(
-            select(Resume).where(Resume.id == resume_id, Resume.owner_id == user_id)
-        )
-        resume = result.scalar_one_or_none()
-        if not resume:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found"
-            )
-        return ResumeSchema.from_orm(resume)
+        async def load() -> ResumeSchema:
+            # Своя сессия: загрузку разделяют несколько запросов, и она не
+            # должна зависеть от сессии запроса, который ее начал.
+            async with get_session_maker()() as session:
+                resume = await session.scalar(
+                    select(Resume).where(
+                        Resume.id == resume_id, Resume.owner_id == user_id
+                    )
+                )
+            if not resume:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found"
+                )
+            return ResumeSchema.from_orm(resume)
+
+        # Сессия запроса уже держит соединение (после проверки токена);
+        # отпускаем его, иначе каждый промах занимал бы два соединения пула
+        # и при полном пуле запросы ждали бы друг друга до таймаута.
+        await db.rollback()
+        return await resume_cache.get_or_load(user_id, resume_id, load)
 
     @staticmethod
+    @traced("ResumeService.create_resume")
     async def create_resume(
         db: AsyncSession, resume_data: ResumeCreate, user_id: int
     ) -> ResumeSchema:
@@ -44,15 +62,24 @@ class ResumeService:
 
         db_resume = Resume(**resume_data.model_dump(), owner_id=user_id)
         db.add(db_resume)
+        await db.flush()
+        await ResumeEventService.notify(
+            db, "resume.created", user_id, db_resume.id, version=db_resume.version
+        )
         await db.commit()
-        await db.refresh(db_resume)
-        return ResumeSchema.from_orm(db_resume)
+        resume_schema = ResumeSchema.from_orm(db_resume)
+        await resume_cache.set(resume_schema)
+        return resume_schema
 
     @staticmethod
+    @traced("ResumeService.update_resume")
     async def update_resume(
-        db: AsyncSession, resume_id: int, resume_data: ResumeCreate, user_id: int
+        db: AsyncSession, resume_id: int, resume_data: ResumeUpdate, user_id: int
     ) -> ResumeSchema:
-        """Обновляет резюме."""
+        """
+        Обновляет резюме. Запись выполняется только если версия резюме
+        не изменилась с момента чтения, иначе возвращается 409.
+        """
 
         result = await db.execute(
             select(Resume).where(Resume.id == resume_id, Resume.owner_id == user_id)
@@ -62,13 +89,65 @@ class ResumeService:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found"
             )
-        resume.title = resume_data.title
-        resume.content = resume_data.content
+        expected_version = resume.version
+        if resume_data.version is not None and resume_data.version != expected_version:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Resume was modified concurrently",
+            )
+        resume = await ResumeService.update_resume_versioned(
+            db,
+            resume_id,
+            user_id,
+            expected_version,
+            title=resume_data.title,
+            content=resume_data.content,
+        )
+        await ResumeEventService.notify(
+            db, "resume.updated", user_id, resume_id, version=resume.version
+        )
+        # До коммита (и рассылки NOTIFY) убираем старое значение из
+        # разделяемого кэша, чтобы другие воркеры не вернули его себе.
+        await resume_cache.invalidate(user_id, resume_id)
         await db.commit()
-        await db.refresh(resume)
-        return ResumeSchema.from_orm(resume)
+        resume_schema = ResumeSchema.from_orm(resume)
+        await resume_cache.set(resume_schema)
+        return resume_schema
+
+    @staticmethod
+    @traced("ResumeService.update_resume_versioned")
+    async def update_resume_versioned(
+        db: AsyncSession, resume_id: int, user_id: int, expected_version: int, **values
+    ) -> Resume:
+        """
+        Выполняет UPDATE ... WHERE version = expected_version и увеличивает
+        версию. Если резюме уже изменено другим запросом, откатывает
+        транзакцию и возвращает 409.
+        """
+
+        result = await db.execute(
+            update(Resume)
+            .where(
+                Resume.id == resume_id,
+                Resume.owner_id == user_id,
+                Resume.version == expected_version,
+            )
+            .values(**values, version=Resume.version + 1)
+            .returning(Resume)
+            .execution_options(populate_existing=True)
+        )
+        resume = result.scalar_one_or_none()
+        if not resume:
+            await db.rollback()
+            await resume_cache.invalidate(user_id, resume_id)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Resume was modified concurrently",
+            )
+        return resume
 
     @staticmethod
+    @traced("ResumeService.delete_resume")
     async def delete_resume(db: AsyncSession, resume_id: int, user_id: int) -> None:
         """Удаляет резюме."""
 
@@ -80,5 +159,13 @@ class ResumeService:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found"
             )
+        # Версия удаления выше любой версии резюме: по ней воркеры
+        # отбрасывают значения, закэшированные до удаления.
+        deleted_version = resume.version + 1
         await db.delete(resume)
+        await ResumeEventService.notify(
+            db, "resume.deleted", user_id, resume_id, version=deleted_version
+        )
+        await resume_cache.invalidate(user_id, resume_id)
         await db.commit()
+        await resume_cache.remove(user_id, resume_id, deleted_version)
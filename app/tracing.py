@@ -0,0 +1,354 @@
+import functools
+import json
+import queue
+import random
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Protocol
+from uuid import uuid4
+
+from app.config import settings
+from loguru import logger
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    name: str
+    parent_id: Optional[str] = None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    spans: List[Span] = field(default_factory=list)
+
+
+class SpanExporter(Protocol):
+    """Получатель завершенных трасс."""
+
+    def export(self, spans: List[Span]) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class InMemoryExporter:
+    """Хранит трассы в памяти (для тестов)."""
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]) -> None:
+        self.spans.extend(spans)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class _BackgroundExporter(ABC):
+    """Отправляет трассы из отдельного потока, не задерживая обработку запросов."""
+
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[Optional[List[Span]]]" = queue.Queue(maxsize=1000)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def export(self, spans: List[Span]) -> None:
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            pass
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            while len(batch) < 512:
+                try:
+                    more = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    self._safe_write(batch)
+                    return
+                batch = batch + more
+            self._safe_write(batch)
+
+    def _safe_write(self, spans: List[Span]) -> None:
+        try:
+            self._write(spans)
+        except Exception as ex:
+            logger.bind(log_id="tracing").warning(f"Trace export failed: {ex}")
+
+    @abstractmethod
+    def _write(self, spans: List[Span]) -> None:
+        """Отправляет пачку спанов; вызывается из фонового потока."""
+
+
+class FileExporter(_BackgroundExporter):
+    """Записывает спаны в файл в формате JSON Lines."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        super().__init__()
+
+    def _write(self, spans: List[Span]) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            for span in spans:
+                file.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+class OTLPExporter(_BackgroundExporter):
+    """Отправляет спаны в OTLP-коллектор по HTTP (JSON-кодирование)."""
+
+    def __init__(self, endpoint: str, service_name: str) -> None:
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        super().__init__()
+
+    @staticmethod
+    def _attribute(key: str, value: Any) -> dict:
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    def _span(self, span: Span) -> dict:
+        data = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 2 if span.parent_id is None else 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns or span.start_ns),
+            "attributes": [
+                self._attribute(key, value) for key, value in span.attributes.items()
+            ],
+            "status": (
+                {"code": 2, "message": span.error} if span.error else {"code": 1}
+            ),
+        }
+        if span.parent_id:
+            data["parentSpanId"] = span.parent_id
+        return data
+
+    def _write(self, spans: List[Span]) -> None:
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            self._attribute("service.name", self.service_name)
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "app.tracing"},
+                            "spans": [self._span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=5):
+            pass
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_exporter: Optional[SpanExporter] = None
+
+
+def _new_span_id() -> str:
+    return uuid4().hex[:16]
+
+
+def get_exporter() -> Optional[SpanExporter]:
+    """Создает экспортер по настройкам при первом обращении."""
+
+    global _exporter
+    if _exporter is None:
+        if settings.tracing_exporter == "otlp":
+            _exporter = OTLPExporter(
+                settings.tracing_otlp_endpoint, settings.tracing_service_name
+            )
+        elif settings.tracing_exporter == "file":
+            _exporter = FileExporter(settings.tracing_file_path)
+        elif settings.tracing_exporter == "memory":
+            _exporter = InMemoryExporter()
+    return _exporter
+
+
+def set_exporter(exporter: Optional[SpanExporter]) -> None:
+    """Подменяет экспортер (например, на InMemoryExporter в тестах)."""
+
+    global _exporter
+    _exporter = exporter
+
+
+def shutdown_exporter() -> None:
+    """Дожидается отправки накопленных трасс."""
+
+    global _exporter
+    if _exporter is not None:
+        _exporter.shutdown()
+        _exporter = None
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def start_trace(name: str, trace_id: str, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Открывает корневой спан запроса. Решение о семплировании принимается
+    здесь; в несемплированных запросах все вложенные спаны - пустые операции.
+    """
+
+    exporter = get_exporter()
+    if exporter is None or random.random() >= settings.tracing_sample_rate:
+        yield None
+        return
+    trace = Trace(trace_id=trace_id)
+    trace_token = _trace.set(trace)
+    try:
+        with span(name, **attributes) as root:
+            yield root
+    finally:
+        _trace.reset(trace_token)
+        exporter.export(trace.spans)
+
+
+def open_span(name: str, **attributes) -> Optional[Span]:
+    """Создает дочерний спан без переключения текущего (для листовых операций)."""
+
+    trace = _trace.get()
+    if trace is None:
+        return None
+    parent = _current_span.get()
+    child = Span(
+        trace_id=trace.trace_id,
+        span_id=_new_span_id(),
+        name=name,
+        parent_id=parent.span_id if parent else None,
+        attributes=attributes,
+    )
+    trace.spans.append(child)
+    return child
+
+
+def close_span(child: Optional[Span], error: Optional[BaseException] = None) -> None:
+    if child is None:
+        return
+    child.end_ns = time.time_ns()
+    if error is not None:
+        child.error = f"{type(error).__name__}: {error}"
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """Спан вокруг блока кода; вне семплированной трассы ничего не делает."""
+
+    if _trace.get() is None:
+        yield None
+        return
+    child = open_span(name, **attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as ex:
+        close_span(child, ex)
+        raise
+    else:
+        close_span(child)
+    finally:
+        _current_span.reset(token)
+
+
+def traced(name: str):
+    """Декоратор асинхронной функции, оборачивающий каждый вызов в спан."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if _trace.get() is None:
+                return await func(*args, **kwargs)
+            with span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def install_sql_tracing(engine) -> None:
+    """Добавляет спан на каждый SQL-запрос через события SQLAlchemy."""
+
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        if context is not None:
+            context._trace_span = open_span(
+                "sql", statement=statement[:500], executemany=executemany
+            )
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            close_span(getattr(context, "_trace_span", None))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        context = exception_context.execution_context
+        if context is not None:
+            close_span(
+                getattr(context, "_trace_span", None),
+                exception_context.original_exception,
+            )
@@ -0,0 +1,133 @@
+"""partition resume_improvements
+
+Revision ID: 3f9c1d7a2b64
+Revises: b24526a0ca19
+Create Date: 2026-10-19 19:02:41.518302
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c1d7a2b64"
+down_revision: Union[str, Sequence[str], None] = "b24526a0ca19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Секции создаются наперед (и дальше - фоновой задачей приложения).
+# DEFAULT-секции нет: с ней невозможен DETACH PARTITION ... CONCURRENTLY.
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE resume_improvements RENAME TO resume_improvements_old")
+    op.execute(
+        "ALTER TABLE resume_improvements_old "
+        "RENAME CONSTRAINT resume_improvements_pkey TO resume_improvements_old_pkey"
+    )
+    op.execute(
+        "ALTER INDEX ix_resume_improvements_id RENAME TO ix_resume_improvements_old_id"
+    )
+    op.execute(
+        """
+        CREATE TABLE resume_improvements (
+            id INTEGER NOT NULL DEFAULT nextval('resume_improvements_id_seq'),
+            resume_id INTEGER NOT NULL
+                REFERENCES resumes (id) ON DELETE CASCADE,
+            improved_content TEXT NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT resume_improvements_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute(
+        "ALTER SEQUENCE resume_improvements_id_seq OWNED BY resume_improvements.id"
+    )
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            part_start timestamp;
+            last_start timestamp;
+        BEGIN
+            SELECT date_trunc(
+                'month', coalesce(min(created_at), now()) AT TIME ZONE 'UTC'
+            )
+            INTO part_start
+            FROM resume_improvements_old;
+            last_start := date_trunc('month', now() AT TIME ZONE 'UTC')
+                + interval '{MONTHS_AHEAD} months';
+            WHILE part_start <= last_start LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF resume_improvements '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'resume_improvements_p' || to_char(part_start, 'YYYYMM'),
+                    part_start AT TIME ZONE 'UTC',
+                    (part_start + interval '1 month') AT TIME ZONE 'UTC'
+                );
+                part_start := part_start + interval '1 month';
+            END LOOP;
+        END $$
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO resume_improvements (id, resume_id, improved_content, created_at)
+        SELECT id, resume_id, improved_content, coalesce(created_at, now())
+        FROM resume_improvements_old
+        """
+    )
+    op.execute("DROP TABLE resume_improvements_old")
+    op.create_index(
+        "ix_resume_improvements_id", "resume_improvements", ["id"], unique=False
+    )
+    op.create_index(
+        "ix_resume_improvements_resume_id_created_at",
+        "resume_improvements",
+        ["resume_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE resume_improvements RENAME TO resume_improvements_old")
+    op.execute(
+        "ALTER TABLE resume_improvements_old "
+        "RENAME CONSTRAINT resume_improvements_pkey TO resume_improvements_old_pkey"
+    )
+    op.execute(
+        "ALTER INDEX ix_resume_improvements_id RENAME TO ix_resume_improvements_old_id"
+    )
+    op.execute(
+        "ALTER INDEX ix_resume_improvements_resume_id_created_at "
+        "RENAME TO ix_resume_improvements_old_resume_id_created_at"
+    )
+    op.execute(
+        """
+        CREATE TABLE resume_improvements (
+            id INTEGER NOT NULL DEFAULT nextval('resume_improvements_id_seq'),
+            resume_id INTEGER NOT NULL REFERENCES resumes (id),
+            improved_content TEXT NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            CONSTRAINT resume_improvements_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(
+        "ALTER SEQUENCE resume_improvements_id_seq OWNED BY resume_improvements.id"
+    )
+    op.execute(
+        """
+        INSERT INTO resume_improvements (id, resume_id, improved_content, created_at)
+        SELECT id, resume_id, improved_content, created_at
+        FROM resume_improvements_old
+        """
+    )
+    op.execute("DROP TABLE resume_improvements_old")
+    op.create_index(
+        "ix_resume_improvements_id", "resume_improvements", ["id"], unique=False
+    )
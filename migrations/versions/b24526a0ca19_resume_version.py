@@ -0,0 +1,31 @@
+"""resume version
+
+Revision ID: b24526a0ca19
+Revises: e59e6e8e08b1
+Create Date: 2026-10-19 18:35:12.104528
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b24526a0ca19"
+down_revision: Union[str, Sequence[str], None] = "e59e6e8e08b1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "resumes",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("resumes", "version")
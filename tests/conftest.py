@@ -0,0 +1,175 @@
+import os
+from typing import AsyncIterator, Awaitable, Callable, Dict, List
+
+import httpx
+import pytest
+from app.config import settings
+from app.db import Base, dispose_engine, get_engine, get_session_maker
+from app.main import app
+from app.models import Resume, ResumeImprovement, User
+from app.querybudget import QueryStats, budget_violations, count_queries
+from app.services.archive import ImprovementArchiveService
+from app.services.auth import AuthService, get_bcrypt_context
+from app.services.cache import resume_cache
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from starlette.routing import Match
+
+# Отдельная база локального Postgres: схема пересоздается перед каждым тестом.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+PASSWORD = "test-password"
+
+
+def route_budget(method: str, path: str) -> int:
+    """Бюджет SQL-запросов, объявленный маршрутом через query_budget(N)."""
+
+    scope = {
+        "type": "websocket" if method == "WS" else "http",
+        "method": method,
+        "path": path,
+        "root_path": "",
+    }
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match != Match.FULL:
+            continue
+        for dependency in getattr(route, "dependencies", []):
+            budget = getattr(dependency.dependency, "query_budget", None)
+            if budget is not None:
+                return budget
+        raise AssertionError(f"{method} {path} declares no query budget")
+    raise AssertionError(f"No route for {method} {path}")
+
+
+def assert_within_budget(stats: QueryStats, method: str, path: str) -> None:
+    """Падает, если запросов больше бюджета маршрута или есть признаки N+1."""
+
+    violations = budget_violations(
+        stats, route_budget(method, path), settings.query_repeat_threshold
+    )
+    assert not violations, f"{method} {path}: {'; '.join(violations)}"
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def database(monkeypatch) -> AsyncIterator[None]:
+    """Пустая схема в TEST_DATABASE_URL; без доступной БД тест пропускается."""
+
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    monkeypatch.setattr(settings, "database_url", TEST_DATABASE_URL)
+    # Запросы считает сам тест, middleware не должен подменять счетчик.
+    monkeypatch.setattr(settings, "query_budget_mode", "off")
+    await dispose_engine()
+    try:
+        async with get_engine().connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except (OSError, DBAPIError) as ex:
+        await dispose_engine()
+        pytest.skip(f"Test database is unreachable: {ex}")
+    async with get_engine().connect() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.commit()
+        await ImprovementArchiveService.ensure_partitions(conn, 1)
+    resume_cache.clear()
+    yield
+    resume_cache.clear()
+    await dispose_engine()
+
+
+@pytest.fixture
+async def client(database) -> AsyncIterator[httpx.AsyncClient]:
+    """HTTP-клиент к приложению (с lifespan) без сетевого сервера."""
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            yield client
+
+
+@pytest.fixture
+async def users(database) -> List[User]:
+    """Два активных пользователя с паролем PASSWORD."""
+
+    hashed_password = get_bcrypt_context().hash(PASSWORD)
+    users = [
+        User(
+            username=f"user{number}",
+            email=f"user{number}@example.com",
+            hashed_password=hashed_password,
+            is_active=True,
+        )
+        for number in (1, 2)
+    ]
+    async with get_session_maker()() as db:
+        db.add_all(users)
+        await db.commit()
+    return users
+
+
+@pytest.fixture
+async def user(users) -> User:
+    return users[0]
+
+
+@pytest.fixture
+async def token(user) -> str:
+    return await AuthService.create_token(user.username, user.id)
+
+
+@pytest.fixture
+def auth_headers(token) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def resumes(user) -> List[Resume]:
+    """Несколько резюме пользователя с историей улучшений (чтобы проявился N+1)."""
+
+    resumes = [
+        Resume(title=f"Resume {number}", content="Python developer", owner_id=user.id)
+        for number in range(5)
+    ]
+    async with get_session_maker()() as db:
+        db.add_all(resumes)
+        await db.flush()
+        db.add_all(
+            ResumeImprovement(
+                resume_id=resume.id, improved_content=f"Improved {number}"
+            )
+            for resume in resumes
+            for number in range(3)
+        )
+        await db.commit()
+    return resumes
+
+
+@pytest.fixture
+async def resume(resumes) -> Resume:
+    return resumes[0]
+
+
+@pytest.fixture
+def api(
+    client: httpx.AsyncClient,
+) -> Callable[..., Awaitable[httpx.Response]]:
+    """
+    Выполняет запрос внутри count_queries() и проверяет бюджет маршрута:
+
+        response = await api("GET", "/resumes/", headers=auth_headers)
+    """
+
+    async def call(method: str, url: str, **kwargs) -> httpx.Response:
+        with count_queries() as stats:
+            response = await client.request(method, url, **kwargs)
+        assert_within_budget(stats, method, httpx.URL(url).path)
+        return response
+
+    return call
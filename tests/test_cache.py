@@ -0,0 +1,112 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from app.schemas import Resume
+from app.services.cache import InMemorySharedCache, ResumeCache
+
+pytestmark = pytest.mark.anyio
+
+
+def make_resume(version: int, resume_id: int = 1) -> Resume:
+    now = datetime.now(timezone.utc)
+    return Resume(
+        id=resume_id,
+        owner_id=1,
+        title=f"v{version}",
+        content="Content",
+        version=version,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+class SlowSharedCache(InMemorySharedCache):
+    """Разделяемый кэш, запись в который можно задержать."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def set_if_newer(self, key: str, value: str, version: int, ttl: int) -> bool:
+        await self.release.wait()
+        return await super().set_if_newer(key, value, version, ttl)
+
+
+async def test_older_version_does_not_replace_newer():
+    shared = InMemorySharedCache()
+    cache = ResumeCache(max_size=10, ttl=60, shared=shared)
+    await cache.set(make_resume(3))
+    await cache.set(make_resume(2))
+    assert (await cache.get(1, 1)).version == 3
+
+    other_worker = ResumeCache(max_size=10, ttl=60, shared=shared)
+    await other_worker.set(make_resume(1))
+    assert (await other_worker.get(1, 1)).version == 3
+
+
+async def test_cancelled_leader_does_not_cancel_waiters():
+    cache = ResumeCache(max_size=10, ttl=60)
+    calls = 0
+
+    async def loader() -> Resume:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return make_resume(1)
+
+    leader = asyncio.ensure_future(cache.get_or_load(1, 1, loader))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(cache.get_or_load(1, 1, loader))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert (await waiter).version == 1
+    assert calls == 1
+
+
+async def test_invalidate_during_store_drops_loaded_value():
+    shared = SlowSharedCache()
+    cache = ResumeCache(max_size=10, ttl=60, shared=shared)
+    shared.release.clear()
+
+    async def loader() -> Resume:
+        return make_resume(1)
+
+    load = asyncio.ensure_future(cache.get_or_load(1, 1, loader))
+    await asyncio.sleep(0.01)
+    # Загрузка ждет записи в разделяемый кэш, а резюме в это время удаляют.
+    await cache.invalidate(1, 1)
+    shared.release.set()
+    await load
+    assert await cache.get(1, 1) is None
+
+
+async def test_event_version_rejects_older_shared_value():
+    shared = InMemorySharedCache()
+    cache = ResumeCache(max_size=10, ttl=60, shared=shared)
+    await cache.set(make_resume(1))
+
+    # Событие о версии 2 пришло раньше, чем писатель обновил кэш.
+    other_worker = ResumeCache(max_size=10, ttl=60, shared=shared)
+    other_worker.raise_floor(1, 1, 2)
+    assert await other_worker.get(1, 1) is None
+
+    async def loader() -> Resume:
+        return make_resume(1)
+
+    await other_worker.get_or_load(1, 1, loader)
+    assert await other_worker.get(1, 1) is None
+
+
+async def test_removed_resume_is_not_served_by_other_workers():
+    shared = InMemorySharedCache()
+    writer = ResumeCache(max_size=10, ttl=60, shared=shared)
+    reader = ResumeCache(max_size=10, ttl=60, shared=shared)
+    await writer.set(make_resume(1))
+    await writer.remove(1, 1, 2)
+
+    # Опоздавшая запись старой версии не перекрывает удаление.
+    await reader.set(make_resume(1))
+    assert await reader.get(1, 1) is None
+    assert await writer.get(1, 1) is None
@@ -0,0 +1,98 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import pytest
+from app.db import get_session_maker
+from app.models import Resume, ResumeImprovement
+from sqlalchemy import func, select, text
+
+pytestmark = pytest.mark.anyio
+
+
+async def count_improvements(resume_id: int) -> int:
+    async with get_session_maker()() as db:
+        return await db.scalar(
+            select(func.count())
+            .select_from(ResumeImprovement)
+            .where(ResumeImprovement.resume_id == resume_id)
+        )
+
+
+@asynccontextmanager
+async def row_locked(resume_id: int) -> AsyncIterator[None]:
+    """Держит блокировку строки резюме, пока запросы внутри блока не упрутся в нее."""
+
+    async with get_session_maker()() as db:
+        await db.execute(select(Resume).where(Resume.id == resume_id).with_for_update())
+        yield
+        await db.rollback()
+
+
+async def wait_for_lock_waiters(count: int) -> None:
+    """Ждет, пока count запросов будут ждать блокировку строки."""
+
+    async with get_session_maker()() as db:
+        for _ in range(100):
+            waiting = await db.scalar(
+                text(
+                    "SELECT count(*) FROM pg_stat_activity "
+                    "WHERE wait_event_type = 'Lock' AND datname = current_database()"
+                )
+            )
+            await db.rollback()
+            if waiting >= count:
+                return
+            await asyncio.sleep(0.05)
+    raise AssertionError(f"{count} requests did not block on the resume row")
+
+
+async def test_update_with_stale_version_conflicts(client, resume, auth_headers):
+    url = f"/resumes/{resume.id}"
+    async with row_locked(resume.id):
+        # Оба запроса прочитали одну версию и ждут UPDATE ... WHERE version = ...
+        requests = asyncio.ensure_future(
+            asyncio.gather(
+                *(
+                    client.put(
+                        url,
+                        json={
+                            "title": title,
+                            "content": "Content",
+                            "version": resume.version,
+                        },
+                        headers=auth_headers,
+                    )
+                    for title in ("First", "Second")
+                )
+            )
+        )
+        await wait_for_lock_waiters(2)
+    responses = await requests
+    assert sorted(response.status_code for response in responses) == [200, 409]
+
+    stale = await client.put(
+        url,
+        json={"title": "Stale", "content": "Content", "version": resume.version},
+        headers=auth_headers,
+    )
+    assert stale.status_code == 409
+    current = await client.get(url, headers=auth_headers)
+    assert current.json()["version"] == resume.version + 1
+
+
+async def test_concurrent_improve_conflicts(client, resume, auth_headers):
+    before = await count_improvements(resume.id)
+    url = f"/ai/resume/{resume.id}/improve"
+    async with row_locked(resume.id):
+        requests = asyncio.ensure_future(
+            asyncio.gather(
+                client.post(url, headers=auth_headers),
+                client.post(url, headers=auth_headers),
+            )
+        )
+        await wait_for_lock_waiters(2)
+    responses = await requests
+    assert sorted(response.status_code for response in responses) == [200, 409]
+    # Проигравший запрос откатывается целиком, без записи в историю.
+    assert await count_improvements(resume.id) == before + 1
@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+
+import pytest
+from app.config import settings
+from app.services import archive
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_saturated_pool_is_not_reported_as_db_outage(client, monkeypatch):
+    monkeypatch.setattr(settings, "readiness_max_pool_saturation", 0.0)
+    response = await client.get("/readyz")
+    assert response.status_code == 503
+    body = response.json()
+    assert body["pool"]["saturated"]
+    assert body["database"] == {"ok": None, "skipped": "pool saturated"}
+
+
+def test_partitions_ahead_shrinks_without_maintenance(monkeypatch):
+    current = archive.month_start(datetime.now(timezone.utc))
+    monkeypatch.setattr(settings, "improvements_partitions_ahead", 3)
+    monkeypatch.setattr(archive, "_latest_partition", archive.add_months(current, 3))
+    assert archive.partitions_ahead() == 3
+    assert archive.check_partitions_ahead()
+    # Обслуживание не выполнялось два месяца: последняя секция стала ближе.
+    monkeypatch.setattr(archive, "_latest_partition", archive.add_months(current, 1))
+    assert archive.partitions_ahead() == 1
+    assert not archive.check_partitions_ahead()
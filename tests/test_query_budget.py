@@ -0,0 +1,204 @@
+import asyncio
+
+import pytest
+from app.config import settings
+from app.db import dispose_engine
+from app.main import app
+from app.models import Resume, User
+from app.querybudget import count_queries
+from app.services.events import change_feed
+from fastapi.routing import APIRoute, APIWebSocketRoute
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+
+from tests.conftest import PASSWORD, assert_within_budget
+
+pytestmark = pytest.mark.anyio
+
+
+def test_every_route_declares_budget():
+    for route in app.routes:
+        if isinstance(route, (APIRoute, APIWebSocketRoute)):
+            assert any(
+                getattr(dependency.dependency, "query_budget", None) is not None
+                for dependency in route.dependencies
+            ), f"{route.path} declares no query budget"
+
+
+def test_relationships_do_not_lazy_load():
+    engine = create_engine("sqlite://")
+    tables = [User.__table__, Resume.__table__]
+    User.metadata.create_all(engine, tables=tables)
+    with Session(engine) as db:
+        user = User(username="user", email="user@example.com", hashed_password="-")
+        db.add(user)
+        db.flush()
+        db.add(Resume(title="Resume", content="Content", owner_id=user.id))
+        db.commit()
+    with Session(engine) as db:
+        resume = db.scalar(select(Resume))
+        with pytest.raises(InvalidRequestError, match="raise_on_sql"):
+            resume.owner
+        with pytest.raises(InvalidRequestError, match="raise_on_sql"):
+            resume.improvements
+        with pytest.raises(InvalidRequestError, match="raise_on_sql"):
+            db.scalar(select(User)).resumes
+
+
+async def test_liveness(api):
+    response = await api("GET", "/healthz")
+    assert response.status_code == 200
+
+
+async def test_readiness(api):
+    response = await api("GET", "/readyz")
+    assert response.json()["database"]["ok"]
+
+
+async def test_register(api):
+    response = await api(
+        "POST",
+        "/auth/register",
+        json={"username": "new", "email": "new@example.com", "password": PASSWORD},
+    )
+    assert response.status_code == 201
+
+
+async def test_login(api, user):
+    response = await api(
+        "POST", "/auth/token", data={"username": user.username, "password": PASSWORD}
+    )
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+
+
+async def test_read_current_user(api, user, auth_headers):
+    response = await api("GET", "/auth/me", headers=auth_headers)
+    assert response.json()["id"] == user.id
+
+
+async def test_check_token(api, auth_headers):
+    response = await api("GET", "/auth/check_token", headers=auth_headers)
+    assert response.json()["is_valid"]
+
+
+async def test_get_user_profile(api, user, auth_headers):
+    response = await api("GET", f"/auth/users/{user.id}", headers=auth_headers)
+    assert response.json()["username"] == user.username
+
+
+async def test_delete_user(api, users, auth_headers):
+    response = await api("DELETE", f"/auth/users/{users[1].id}", headers=auth_headers)
+    assert response.status_code == 204
+
+
+async def test_get_users(api, users):
+    response = await api("GET", "/auth/users")
+    assert len(response.json()) == len(users)
+
+
+async def test_get_user_resumes(api, resumes, auth_headers):
+    response = await api("GET", "/resumes/", headers=auth_headers)
+    assert len(response.json()) == len(resumes)
+
+
+async def test_get_resume(api, resume, auth_headers):
+    response = await api("GET", f"/resumes/{resume.id}", headers=auth_headers)
+    assert response.json()["id"] == resume.id
+
+
+async def test_create_resume(api, user, auth_headers):
+    response = await api(
+        "POST",
+        "/resumes/",
+        json={"title": "New", "content": "Content"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+
+
+async def test_update_resume(api, resume, auth_headers):
+    response = await api(
+        "PUT",
+        f"/resumes/{resume.id}",
+        json={"title": "Updated", "content": "Content", "version": resume.version},
+        headers=auth_headers,
+    )
+    assert response.json()["version"] == resume.version + 1
+
+
+async def test_delete_resume(api, resume, auth_headers):
+    response = await api("DELETE", f"/resumes/{resume.id}", headers=auth_headers)
+    assert response.status_code == 204
+
+
+async def test_improve_resume(api, resume, auth_headers):
+    response = await api(
+        "POST", f"/ai/resume/{resume.id}/improve", headers=auth_headers
+    )
+    assert response.json()["resume_id"] == resume.id
+
+
+async def test_get_improvements(api, resume, auth_headers):
+    response = await api(
+        "GET", f"/ai/resume/{resume.id}/improvements", headers=auth_headers
+    )
+    assert len(response.json()) == 3
+
+
+async def test_stream_resume_events(api, auth_headers):
+    # Поток бесконечен: остановка воркера завершает его событием shutdown.
+    change_feed.close()
+    response = await api("GET", "/events/resumes", headers=auth_headers)
+    assert "event: shutdown" in response.text
+
+
+async def test_resume_events_websocket(client, token):
+    path = "/events/resumes/ws"
+    scope = {
+        "type": "websocket",
+        "asgi": {"version": "3.0"},
+        "scheme": "ws",
+        "server": ("test", 80),
+        "client": ("127.0.0.1", 50000),
+        "root_path": "",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": f"token={token}".encode(),
+        "headers": [],
+        "subprotocols": [],
+    }
+    incoming: asyncio.Queue = asyncio.Queue()
+    await incoming.put({"type": "websocket.connect"})
+    sent = []
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+        if message["type"] == "websocket.accept":
+            await incoming.put({"type": "websocket.disconnect", "code": 1000})
+
+    with count_queries() as stats:
+        await app(scope, incoming.get, send)
+    assert sent[0]["type"] == "websocket.accept"
+    assert_within_budget(stats, "WS", path)
+
+
+async def test_concurrent_resume_misses_do_not_exhaust_pool(
+    client, resumes, auth_headers, monkeypatch
+):
+    # Пул меньше числа одновременных промахов: каждый запрос должен держать
+    # не больше одного соединения, иначе все они ждут друг друга.
+    monkeypatch.setattr(settings, "db_pool_size", 2)
+    monkeypatch.setattr(settings, "db_max_overflow", 0)
+    await dispose_engine()
+    responses = await asyncio.wait_for(
+        asyncio.gather(
+            *(
+                client.get(f"/resumes/{resume.id}", headers=auth_headers)
+                for resume in resumes
+            )
+        ),
+        timeout=10,
+    )
+    assert [response.status_code for response in responses] == [200] * len(resumes)